@@ -8,28 +8,149 @@
 #    pip install yt-dlp
 # 3. For the best quality options (merging video and audio) and for MP3 conversion,
 #    you MUST have FFmpeg installed. You can download it from ffmpeg.org.
+#
+# Usage:
+#   python downloader.py [--quick] [--background]         (interactive menu)
+#   python downloader.py --batch urls.txt [--format best] [--workers 4]
 
-import yt_dlp
+# yt_dlp is imported inside the functions that use it: it takes a noticeable time to load
+# and isn't needed for --help or for quitting at the first prompt.
 import sys
 import os
+import time
+import argparse
+import atexit
+import collections
+import asyncio
+import hashlib
+import heapq
+import json
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from urllib.parse import urlparse, urlunparse, parse_qs, urlencode
 
+# Fixed quality presets used by the playlist menu (in this order) and by batch mode.
+# Each maps to (menu label, yt-dlp format selection, output type, postprocessor).
+QUALITY_PRESETS = {
+    'best': ("Best Quality Video (up to 1080p)", 'bestvideo[height<=1080][ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best', 'video', {'key': 'FFmpegVideoRemuxer', 'preferedformat': 'mp4'}),
+    'good': ("Good Quality Video (up to 720p)", 'bestvideo[height<=720][ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best', 'video', {'key': 'FFmpegVideoRemuxer', 'preferedformat': 'mp4'}),
+    'standard': ("Standard Quality Video (up to 480p)", 'bestvideo[height<=480][ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best', 'video', {'key': 'FFmpegVideoRemuxer', 'preferedformat': 'mp4'}),
+    'audio': ("Best Quality Audio (MP3)", 'bestaudio/best', 'audio', {'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3', 'preferredquality': '192'}),
+    'audio-standard': ("Standard Quality Audio (MP3)", 'bestaudio[abr<=128]', 'audio', {'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3', 'preferredquality': '128'}),
+    'audio-low': ("Low Quality Audio (MP3)", 'worstaudio/bestaudio[abr<=64]', 'audio', {'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3', 'preferredquality': '96'}),
+}
+
+# LAME VBR levels (-q:a) with about the same average bitrate as the fixed MP3 bitrates above.
+# VBR encodes faster than CBR and spends the bits where the audio needs them; used with --vbr.
+MP3_VBR_QUALITY = {'192': '2', '128': '5', '96': '7'}
+_use_vbr = False
+
+# With --background, single video downloads run here while the user is back at the URL prompt
+_background_downloads = None
+# Held while writing multi-line output, so lines from download threads don't land inside a menu
+_console_lock = threading.Lock()
+
+# Transfer settings shared by every download: DASH/HLS fragments fetched in parallel
+# (--frag-workers) and progressive files requested in 10 MiB ranges.
+FRAGMENT_WORKERS = 8
+_transfer_opts = {'concurrent_fragment_downloads': FRAGMENT_WORKERS, 'http_chunk_size': 10 * 1024 * 1024}
+
+# yt-dlp extractor families for well-known hosts. Restricting a YoutubeDL to one family means a URL
+# is only matched against those extractors instead of the whole list.
+KNOWN_EXTRACTORS = {'youtube.com': 'youtube', 'youtu.be': 'youtube', 'vimeo.com': 'vimeo', 'soundcloud.com': 'soundcloud'}
+
+# Options for the quick probe that tells playlists apart from single videos: only the first
+# page of a playlist is looked at and its entries are left unresolved.
+PLAYLIST_PROBE_OPTS = {'quiet': True, 'extract_flat': 'in_playlist', 'lazy_playlist': True, 'playlist_items': '1'}
+# Options for listing every entry of a playlist before downloading them. Entries stay unresolved
+# (one page request per batch of entries, not one per video), but a link that redirects to the
+# playlist, such as a channel URL to its videos tab, is still followed.
+PLAYLIST_LIST_OPTS = {'quiet': True, 'extract_flat': 'in_playlist'}
+
+# Long-lived extraction-only YoutubeDL instances, keyed by their options and extractor
+# restriction, so their HTTP connections stay open from one URL to the next.
+_shared_ydls = {}
+# Runs metadata fetches while the main thread keeps printing and prompting
+_fetch_executor = ThreadPoolExecutor(max_workers=2)
+# Prefetches share one YoutubeDL, which is not reentrant, so they take turns
+_prefetch_lock = threading.Lock()
+
+# YouTube links that sanitize_youtube_url would return unchanged (nothing but a video id and a playlist id)
+_CLEAN_RE = re.compile(r'^https?://(?:www\.)?(?:youtube\.com/watch\?v=[\w-]{11}(?:&list=[\w-]+)?|youtu\.be/[\w-]{11})$')
+
+# Options of the YoutubeDL that looks up and then downloads a single video. Only the format list
+# is needed, so nothing else is fetched. DASH/HLS manifests are kept: they hold the 720p/1080p streams.
+SINGLE_VIDEO_OPTS = {
+    'quiet': True,
+    'noplaylist': True,  # only get info for the single video
+    'writesubtitles': False,
+    'writeautomaticsub': False,
+    'writethumbnail': False,
+    'getcomments': False,
+    'extractor_args': {'youtube': {'skip': ['translated_subs']}},
+}
+
+# Menu offered by --quick: plain format selections that yt-dlp resolves itself during the
+# download, so no metadata has to be fetched first (and no sizes can be shown).
+QUICK_CHOICES = [
+    {'label': "Best Quality Video (up to 1080p)", 'format_id': 'bv*[height<=1080][ext=mp4]+ba/b', 'filesize': None, 'type': 'video'},
+    {'label': "Good Quality Video (up to 720p)", 'format_id': 'bv*[height<=720][ext=mp4]+ba/b', 'filesize': None, 'type': 'video'},
+    {'label': "Standard Quality Video (single file)", 'format_id': 'b', 'filesize': None, 'type': 'video'},
+    {'label': "Best Quality Audio (MP3)", 'format_id': 'ba/b', 'filesize': None, 'type': 'audio'},
+]
+
+# Output file names (yt-dlp templates) within the Audio/Video folders
+VIDEO_FILENAME = '%(clean_title)s - [%(id)s].%(ext)s'
+PLAYLIST_FILENAME = '%(playlist)s/%(playlist_index)s - ' + VIDEO_FILENAME
+
+# Default and maximum number of URLs downloaded at once in batch mode
+BATCH_WORKERS = 4
+MAX_BATCH_WORKERS = 8
+
+# Seconds between two progress lines for the same download in batch mode
+BATCH_PROGRESS_INTERVAL = 5
+
+# Metadata returned by extract_info, keyed by URL, so the download step (and choosing the same URL
+# again after "Go back") can skip re-extraction. Only the INFO_CACHE_SIZE most recent URLs are kept.
+INFO_CACHE_SIZE = 8
+_INFO_CACHE = collections.OrderedDict()
+
+# Metadata is also cached on disk between runs for this many seconds
+INFO_CACHE_TTL = 60 * 60
+# Bulky fields the downloader never uses; dropped before writing to the disk cache
+UNCACHED_INFO_FIELDS = ('thumbnails', 'automatic_captions', 'subtitles', 'heatmap')
+_info_db = None
+
+# Units used by format_size, and the divisor for each
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+_SIZE_DIVS = tuple(1 << (10 * n) for n in range(len(_SIZE_UNITS)))
+
 def format_size(size_in_bytes):
     """Converts bytes to a human-readable format (KB, MB, GB)."""
-    if size_in_bytes is None or size_in_bytes == 0:
+    if not size_in_bytes:
         return "N/A"
-    power = 1024
-    n = 0
-    power_labels = {0: '', 1: 'K', 2: 'M', 3: 'G', 4: 'T'}
-    while size_in_bytes >= power and n < len(power_labels):
-        size_in_bytes /= power
-        n += 1
-    return f"{size_in_bytes:.2f} {power_labels[n]}B"
+    # Every 10 bits is one more factor of 1024, so bit_length picks the unit without a loop
+    n = max(0, min((int(size_in_bytes).bit_length() - 1) // 10, 4))
+    return f"{size_in_bytes / _SIZE_DIVS[n]:.2f} {_SIZE_UNITS[n]}"
+
+def console_print(*args):
+    """
+    Prints a line while holding the console lock; used for everything download threads print.
+    """
+    with _console_lock:
+        print(*args)
 
 def sanitize_youtube_url(url):
     """
     Sanitizes YouTube URLs to remove tracking parameters.
     """
+    # Fast paths: clearly not YouTube, or already clean
+    if 'youtu' not in url or _CLEAN_RE.match(url):
+        return url
+
     parsed_url = urlparse(url)
     hostname = parsed_url.hostname
 
@@ -56,98 +177,294 @@ def sanitize_youtube_url(url):
         clean_url = urlunparse((parsed_url.scheme, parsed_url.netloc, parsed_url.path, '', '', ''))
 
     if clean_url and url != clean_url:
-        print(f"Sanitizing URL to: {clean_url}")
+        console_print(f"Sanitizing URL to: {clean_url}")
         return clean_url
     
     return url
 
-def get_smart_choices(url):
+def extractor_opts(url):
     """
-    Fetches format information for a SINGLE video and selects the best options.
+    Returns the YoutubeDL options limiting extraction to the extractor family of a known host, else {}.
     """
-    # 'noplaylist': True ensures we only get info for the single video
-    ydl_opts = {'quiet': True, 'noplaylist': True}
+    host = urlparse(url).hostname or ''
+    for domain, name in KNOWN_EXTRACTORS.items():
+        if host == domain or host.endswith('.' + domain):
+            # Matches e.g. 'youtube' as well as 'youtube:tab' for playlists and channels.
+            # 'generic' stays last as a fallback for links the family doesn't cover, such as
+            # on.soundcloud.com short links, which it resolves by following the redirect.
+            return {'allowed_extractors': [f'{name}(:.+)?', 'generic']}
+    return {}
+
+def is_probable_playlist(url):
+    """
+    Tells from a YouTube URL alone whether it points to a playlist.
+    Returns True or False for YouTube links, and None when only a probe can tell.
+    """
+    parsed_url = urlparse(url)
+    hostname = parsed_url.hostname or ''
+    if hostname == 'youtu.be' or hostname.endswith('.youtu.be'):
+        return 'list' in parse_qs(parsed_url.query)
+    if hostname == 'youtube.com' or hostname.endswith('.youtube.com'):
+        if parsed_url.path.startswith('/playlist') or 'list' in parse_qs(parsed_url.query):
+            return True
+        if parsed_url.path == '/watch' or parsed_url.path.startswith('/shorts/'):
+            return False
+    return None
+
+def get_shared_ydl(url, ydl_opts):
+    """
+    Returns the shared YoutubeDL with the given (extraction only) options for a URL, creating it on first use.
+    """
+    import yt_dlp
+    opts = extractor_opts(url)
+    # repr() because option values may be dicts (e.g. extractor_args)
+    key = (repr(sorted(ydl_opts.items())), tuple(opts.get('allowed_extractors', ())))
+    ydl = _shared_ydls.get(key)
+    if ydl is None:
+        ydl = _shared_ydls[key] = yt_dlp.YoutubeDL({**ydl_opts, **opts})
+    return ydl
+
+@atexit.register
+def close_shared_ydls():
+    """
+    Releases the shared extraction instances on exit.
+    """
+    for ydl in _shared_ydls.values():
+        ydl.close()
+    _shared_ydls.clear()
+
+def prefetch_single_info(url):
+    """
+    Extracts the single video info for a URL and writes it to the disk cache (run on _fetch_executor).
+    The info is cached under the video's own URL, not the (playlist) URL it was fetched from.
+    """
+    # A shared instance keeps its connections to the site open between prefetches
+    with _prefetch_lock:
+        ydl = get_shared_ydl(url, SINGLE_VIDEO_OPTS)
+        info = ydl.extract_info(url, download=False)
+        store_cached_info(info.get('webpage_url') or url, info, ydl)
+    return info
+
+def remember_info(url, info):
+    """
+    Stores an info dict in the in-memory cache as the most recently used entry.
+    """
+    _INFO_CACHE[url] = (time.time(), info)
+    _INFO_CACHE.move_to_end(url)
+    while len(_INFO_CACHE) > INFO_CACHE_SIZE:
+        _INFO_CACHE.popitem(last=False)
+
+def recall_info(url):
+    """
+    Returns the info dict cached in memory for a URL if it is younger than INFO_CACHE_TTL, else None.
+    """
+    entry = _INFO_CACHE.get(url)
+    if entry is None:
+        return None
+    if time.time() - entry[0] >= INFO_CACHE_TTL:
+        # Format URLs expire; a stale entry would fail the download instead of re-extracting
+        _INFO_CACHE.pop(url, None)
+        return None
+    return entry[1]
+
+def open_info_cache():
+    """
+    Opens the on-disk metadata cache ($XDG_CACHE_HOME/umd/info.sqlite3), creating it on first use.
+    """
+    global _info_db
+    if _info_db is None:
+        cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        cache_dir = os.path.join(cache_home, 'umd')
+        os.makedirs(cache_dir, exist_ok=True)
+        _info_db = sqlite3.connect(os.path.join(cache_dir, 'info.sqlite3'), isolation_level=None, check_same_thread=False)
+        _info_db.execute("PRAGMA journal_mode=WAL")
+        _info_db.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, ts REAL, blob TEXT)")
+    return _info_db
+
+def load_cached_info(url):
+    """
+    Returns the info dict cached on disk for a URL if it is younger than INFO_CACHE_TTL, else None.
+    """
+    key = hashlib.sha1(url.encode()).hexdigest()
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        row = open_info_cache().execute("SELECT ts, blob FROM cache WHERE key=?", (key,)).fetchone()
+    except (sqlite3.Error, OSError):
+        return None
+    if row and time.time() - row[0] < INFO_CACHE_TTL:
+        return json.loads(row[1])
+    return None
+
+def store_cached_info(url, info, ydl):
+    """
+    Writes an info dict to the disk cache. Failures are ignored; the cache is only an optimization.
+    """
+    key = hashlib.sha1(url.encode()).hexdigest()
+    # Private keys include requested_formats/requested_downloads of the format selection made
+    # during extraction; a cached copy must not carry them into a later download
+    info = {k: v for k, v in ydl.sanitize_info(info, remove_private_keys=True).items() if k not in UNCACHED_INFO_FIELDS}
+    try:
+        open_info_cache().execute("INSERT OR REPLACE INTO cache (key, ts, blob) VALUES (?, ?, ?)", (key, time.time(), json.dumps(info)))
+    except (sqlite3.Error, OSError):
+        pass
+
+def _fsize(f):
+    """
+    Returns a format's exact or approximate size in bytes, 0 if unknown.
+    """
+    return f.get('filesize') or f.get('filesize_approx') or 0
+
+def get_smart_choices(url, ydl):
+    """
+    Fetches format information for a SINGLE video and selects the best options.
+    Returns a (choices, info) tuple; the info dict is reused by the download step.
+    """
+    info = recall_info(url) or load_cached_info(url)
+    if info is None:
+        try:
             print("Fetching available formats for the single video, please wait...")
             info = ydl.extract_info(url, download=False)
-    except Exception as e:
-        if 'DRM' in str(e):
-            print("\nError: This content is protected by DRM and cannot be downloaded.")
-        else:
-            print(f"\nCould not fetch video information. Error: {e}")
-        return None
+        except Exception as e:
+            if 'DRM' in str(e):
+                print("\nError: This content is protected by DRM and cannot be downloaded.")
+            else:
+                print(f"\nCould not fetch video information. Error: {e}")
+            return None, None
+        store_cached_info(url, info, ydl)
+    remember_info(url, info)
+    return get_smart_choices_from_info(info)
 
+def get_smart_choices_from_info(info):
+    """
+    Selects the best download options from an already extracted info dict.
+    Returns a (choices, info) tuple like get_smart_choices.
+    """
     formats = info.get('formats', [])
     if not formats:
         print("No downloadable formats found.")
-        return None
-
-    # --- Find Best Audio for Merging ---
-    best_audio_for_merge = max(
-        (f for f in formats if f.get('vcodec') == 'none' and f.get('acodec') != 'none' and f.get('abr') is not None),
-        key=lambda f: f.get('abr', 0),
-        default=None
-    )
+        return None, None
 
-    # --- Find Best Video-only Streams, prioritizing those with file sizes ---
-    video_streams = [f for f in formats if f.get('vcodec') != 'none' and f.get('acodec') == 'none' and f.get('ext') == 'mp4' and f.get('tbr') is not None]
-    
-    def find_best_video(streams, height):
-        target_streams = [s for s in streams if s.get('height') == height]
-        if not target_streams: return None
-        sized_streams = [s for s in target_streams if s.get('filesize') or s.get('filesize_approx')]
-        return max(sized_streams or target_streams, key=lambda f: f.get('tbr', 0), default=None)
+    # --- Categorize all formats in a single pass ---
+    # Audio-only streams feed the merge audio and the audio tiers; video-only mp4 streams
+    # are tracked per height as [tbr, best with a known file size, tbr, best overall].
+    best_audio_for_merge = None
+    worst_audio = None
+    audio_streams = []
+    best_video = {1080: [-1, None, -1, None], 720: [-1, None, -1, None]}
+    best_merged = None
+    max_abr = min_abr = None
+    best_merged_height = -1
+    # Bound once, as they are looked up for every format
+    video_slots = best_video.get
+    add_audio = audio_streams.append
+    for f in formats:
+        g = f.get
+        vcodec = g('vcodec')
+        acodec = g('acodec')
+        if vcodec == 'none':
+            abr = g('abr')
+            if acodec != 'none' and abr is not None:
+                add_audio(f)
+                if max_abr is None or abr > max_abr:
+                    max_abr, best_audio_for_merge = abr, f
+                if min_abr is None or abr <= min_abr:
+                    min_abr, worst_audio = abr, f
+        elif acodec == 'none':
+            slots = video_slots(g('height'))
+            tbr = g('tbr')
+            if slots is not None and tbr is not None and g('ext') == 'mp4':
+                if tbr > slots[2]:
+                    slots[2], slots[3] = tbr, f
+                if tbr > slots[0] and (g('filesize') or g('filesize_approx')):
+                    slots[0], slots[1] = tbr, f
+        else:
+            height = g('height') or 0
+            if height > best_merged_height:
+                best_merged_height, best_merged = height, f
 
-    best_1080p = find_best_video(video_streams, 1080)
-    best_720p = find_best_video(video_streams, 720)
-    best_merged = max((f for f in formats if f.get('vcodec') != 'none' and f.get('acodec') != 'none'), key=lambda f: f.get('height', 0), default=None)
+    # Prefer streams with file sizes so the menu can show them
+    best_1080p = best_video[1080][1] or best_video[1080][3]
+    best_720p = best_video[720][1] or best_video[720][3]
 
     # --- Build the Choices Menu ---
-    final_choices = []
+    # Keyed by label so duplicates are dropped as the menu is built
+    final_choices = {}
+    # The video streams are all mp4; with m4a audio yt-dlp can merge straight into an mp4
+    mp4_merge = bool(best_audio_for_merge) and best_audio_for_merge.get('ext') in ('m4a', 'mp4')
+    audio_size = _fsize(best_audio_for_merge) if best_audio_for_merge else 0
     if best_1080p and best_audio_for_merge:
-        video_size = best_1080p.get('filesize') or best_1080p.get('filesize_approx') or 0
-        audio_size = best_audio_for_merge.get('filesize') or best_audio_for_merge.get('filesize_approx') or 0
-        final_choices.append({'label': f"Best Quality Video ({best_1080p.get('resolution')})", 'format_id': f"{best_1080p['format_id']}+{best_audio_for_merge['format_id']}", 'filesize': video_size + audio_size, 'type': 'video'})
+        video_size = _fsize(best_1080p)
+        label = f"Best Quality Video ({best_1080p.get('resolution')})"
+        final_choices.setdefault(label, {'label': label, 'format_id': f"{best_1080p['format_id']}+{best_audio_for_merge['format_id']}", 'filesize': video_size + audio_size, 'type': 'video', 'mp4_merge': mp4_merge})
     if best_720p and best_audio_for_merge:
-        video_size = best_720p.get('filesize') or best_720p.get('filesize_approx') or 0
-        audio_size = best_audio_for_merge.get('filesize') or best_audio_for_merge.get('filesize_approx') or 0
-        final_choices.append({'label': f"Good Quality Video ({best_720p.get('resolution')})", 'format_id': f"{best_720p['format_id']}+{best_audio_for_merge['format_id']}", 'filesize': video_size + audio_size, 'type': 'video'})
+        video_size = _fsize(best_720p)
+        label = f"Good Quality Video ({best_720p.get('resolution')})"
+        final_choices.setdefault(label, {'label': label, 'format_id': f"{best_720p['format_id']}+{best_audio_for_merge['format_id']}", 'filesize': video_size + audio_size, 'type': 'video', 'mp4_merge': mp4_merge})
     if best_merged:
-        final_choices.append({'label': f"Standard Quality Video ({best_merged.get('resolution')}, single file)", 'format_id': best_merged['format_id'], 'filesize': best_merged.get('filesize') or best_merged.get('filesize_approx'), 'type': 'video'})
+        label = f"Standard Quality Video ({best_merged.get('resolution')}, single file)"
+        final_choices.setdefault(label, {'label': label, 'format_id': best_merged['format_id'], 'filesize': _fsize(best_merged), 'type': 'video'})
 
     # --- Find and Add Audio-Only Choices ---
-    all_audio_streams = sorted([f for f in formats if f.get('vcodec') == 'none' and f.get('acodec') != 'none' and f.get('abr') is not None], key=lambda f: f.get('abr', 0), reverse=True)
-    added_audio_labels = set()
-    if all_audio_streams:
-        audio_options_to_add = [all_audio_streams[0]] # Best
-        if len(all_audio_streams) > 2: audio_options_to_add.append(all_audio_streams[len(all_audio_streams) // 2]) # Medium
-        if len(all_audio_streams) > 1: audio_options_to_add.append(all_audio_streams[-1]) # Low
+    # Best and lowest were tracked in the loop; only the middle tier needs a (partial) selection.
+    # Every stream in audio_streams has a numeric abr, so it can be compared on directly.
+    if audio_streams:
+        audio_options_to_add = {best_audio_for_merge['format_id']: best_audio_for_merge} # Best
+        if len(audio_streams) > 2:
+            medium = heapq.nlargest(len(audio_streams) // 2 + 1, audio_streams, key=itemgetter('abr'))[-1]
+            audio_options_to_add.setdefault(medium['format_id'], medium) # Medium
+        if len(audio_streams) > 1: audio_options_to_add.setdefault(worst_audio['format_id'], worst_audio) # Low
         
-        for audio in audio_options_to_add:
+        for audio in audio_options_to_add.values():
             label = f"Audio (~{round(audio.get('abr', 0))}kbps, MP3)"
-            if label not in added_audio_labels:
-                final_choices.append({'label': label, 'format_id': audio['format_id'], 'filesize': audio.get('filesize') or audio.get('filesize_approx'), 'type': 'audio'})
-                added_audio_labels.add(label)
+            final_choices.setdefault(label, {'label': label, 'format_id': audio['format_id'], 'filesize': _fsize(audio), 'type': 'audio'})
 
-    unique_choices = [dict(t) for t in {tuple(d.items()) for d in final_choices}]
-    return sorted(unique_choices, key=lambda x: x.get('filesize', 0), reverse=True)
+    # Every choice has a numeric filesize (0 when unknown), so it can be sorted on directly
+    return sorted(final_choices.values(), key=itemgetter('filesize'), reverse=True), info
 
-def handle_single_download(url, audio_folder, video_folder):
+def mp3_postprocessor(pp_def):
+    """
+    Returns an FFmpegExtractAudio definition switched to the matching LAME VBR level when --vbr is set.
+    """
+    if _use_vbr and pp_def['key'] == 'FFmpegExtractAudio':
+        return dict(pp_def, preferredquality=MP3_VBR_QUALITY.get(pp_def['preferredquality'], '2'))
+    return pp_def
+
+def add_postprocessors(ydl, postprocessors):
+    """
+    Registers postprocessor definitions (as used in 'postprocessors' options) on an existing YoutubeDL.
+    """
+    from yt_dlp.postprocessor import get_postprocessor
+    for pp_def in postprocessors:
+        pp_def = dict(pp_def)
+        when = pp_def.pop('when', 'post_process')
+        ydl.add_post_processor(get_postprocessor(pp_def.pop('key'))(ydl, **pp_def), when=when)
+
+def handle_single_download(url, audio_folder, video_folder, quick=False):
     """
     Presents a detailed menu for a single video and handles the download.
+    With quick=True the fixed QUICK_CHOICES menu is shown instead, without fetching the formats first.
     """
-    choices = get_smart_choices(url)
+    import yt_dlp
+    # One instance serves both the format lookup and the download, so its HTTP
+    # connections and cookies are reused instead of opening a second session.
+    ydl = yt_dlp.YoutubeDL({**SINGLE_VIDEO_OPTS, **_transfer_opts, **extractor_opts(url)})
+    if not select_and_download(ydl, url, audio_folder, video_folder, quick):
+        ydl.close()
+
+def select_and_download(ydl, url, audio_folder, video_folder, quick=False):
+    """
+    Shows the download options for a single video and downloads the selected one with the given YoutubeDL.
+    Returns True if the download was handed to a background thread, which then owns (and closes) ydl.
+    """
+    if quick:
+        choices, info = QUICK_CHOICES, None
+    else:
+        choices, info = get_smart_choices(url, ydl)
     if not choices: return
 
-    print("\n--- Please Select a Download Option ---")
-    for i, choice in enumerate(choices, 1):
-        size_str = format_size(choice['filesize'])
-        print(f"{i}: {choice['label']} (~{size_str})")
-    
     exit_option_number = len(choices) + 1
-    print(f"{exit_option_number}: Go back (Choose another URL)")
-    print("-" * 40)
+    menu = [f"{i}: {choice['label']} (~{'—' if quick else format_size(choice['filesize'])})" for i, choice in enumerate(choices, 1)]
+    with _console_lock:
+        sys.stdout.write("\n--- Please Select a Download Option ---\n" + "\n".join(menu) + f"\n{exit_option_number}: Go back (Choose another URL)\n" + "-" * 40 + "\n")
 
     while True:
         try:
@@ -164,34 +481,65 @@ def handle_single_download(url, audio_folder, video_folder):
             print("Please enter a number.")
             
     # --- Configure Download Options ---
-    output_path_template = os.path.join(audio_folder if selected['type'] == 'audio' else video_folder, '%(clean_title)s - [%(id)s].%(ext)s')
-    ydl_opts = {'format': selected['format_id'], 'outtmpl': output_path_template, 'noplaylist': True}
+    output_path_template = os.path.join(audio_folder if selected['type'] == 'audio' else video_folder, VIDEO_FILENAME)
+    # The instance was created for extraction, so switch it over to download settings.
+    # YoutubeDL compiles params['format'] only in __init__, so the selector is rebuilt here.
+    ydl.params.update({'format': selected['format_id'], 'quiet': False})
+    ydl.params['outtmpl']['default'] = output_path_template
+    ydl.format_selector = ydl.build_format_selector(selected['format_id'])
 
+    postprocessors = []
     if selected['type'] == 'audio':
-        ydl_opts['postprocessors'] = [{'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3', 'preferredquality': '192'}]
+        postprocessors = [mp3_postprocessor({'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3', 'preferredquality': '192'})]
+    elif selected.get('mp4_merge'):
+        # Merging already produces the mp4, so a remux pass would only rewrite the file
+        ydl.params['merge_output_format'] = 'mp4'
     elif '+' in selected['format_id']:
-         ydl_opts['postprocessors'] = [{'key': 'FFmpegVideoRemuxer', 'preferedformat': 'mp4'}]
+         postprocessors = [{'key': 'FFmpegVideoRemuxer', 'preferedformat': 'mp4'}]
+    add_postprocessors(ydl, postprocessors)
+
+    if _background_downloads is not None:
+        # The prompt keeps the console, so report progress the way batch mode does
+        ydl.params.update({'quiet': True, 'noprogress': True})
+        ydl.add_progress_hook(make_batch_progress_hook(url))
+        _background_downloads.submit(run_single_download, ydl, url, info, close=True)
+        console_print("\nDownload started in the background.")
+        return True
+    run_single_download(ydl, url, info)
+    return False
 
+def run_single_download(ydl, url, info, close=False):
+    """
+    Downloads a single video with a fully configured YoutubeDL, closing it afterwards if close=True.
+    """
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            print("\nStarting download... please wait.")
+        console_print("\nStarting download... please wait.")
+        if info is None:
             ydl.download([url])
-            print("\nDownload finished successfully!")
+        else:
+            # Reuse the already extracted info instead of letting yt-dlp fetch it again.
+            # Dropping the private keys removes the requested_formats of the first format
+            # selection (which would otherwise be downloaded instead of the chosen format),
+            # and it returns a fresh copy, so the cached dict itself stays untouched.
+            ydl.process_ie_result(ydl.sanitize_info(info, remove_private_keys=True), download=True)
+        console_print(f"\nDownload finished successfully! ({url})")
     except Exception as e:
-        print(f"\nAn unexpected error occurred during download: {e}")
+        console_print(f"\nAn unexpected error occurred during download: {e}")
+    finally:
+        if close:
+            ydl.close()
 
 def handle_playlist_download(url, audio_folder, video_folder):
     """
     Handles the download process for an entire playlist.
     """
-    print("\n--- Choose a Quality for the ENTIRE Playlist ---")
-    print("1: Best Quality Video (up to 1080p)")
-    print("2: Good Quality Video (up to 720p)")
-    print("3: Standard Quality Video (up to 480p)")
-    print("4: Best Quality Audio (MP3)")
-    print("5: Standard Quality Audio (MP3)")
-    print("6: Low Quality Audio (MP3)")
-    print("7: Go back")
+    import yt_dlp
+    from yt_dlp.utils import sanitize_filename
+    lines = ["\n--- Choose a Quality for the ENTIRE Playlist ---"]
+    lines.extend(f"{i}: {label}" for i, (label, _, _, _) in enumerate(QUALITY_PRESETS.values(), 1))
+    lines.append("7: Go back")
+    with _console_lock:
+        sys.stdout.write("\n".join(lines) + "\n")
     
     while True:
         try:
@@ -204,33 +552,33 @@ def handle_playlist_download(url, audio_folder, video_folder):
         print("\nReturning to URL selection...")
         return
 
-    postprocessors = []
-    output_folder = video_folder # Default to video
-    
-    if choice == 1:
-        format_selection = 'bestvideo[height<=1080][ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best'
-        postprocessors.append({'key': 'FFmpegVideoRemuxer', 'preferedformat': 'mp4'})
-    elif choice == 2:
-        format_selection = 'bestvideo[height<=720][ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best'
-        postprocessors.append({'key': 'FFmpegVideoRemuxer', 'preferedformat': 'mp4'})
-    elif choice == 3:
-        format_selection = 'bestvideo[height<=480][ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best'
-        postprocessors.append({'key': 'FFmpegVideoRemuxer', 'preferedformat': 'mp4'})
-    elif choice == 4: # Best Audio
-        format_selection = 'bestaudio/best'
-        output_folder = audio_folder
-        postprocessors.append({'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3', 'preferredquality': '192'})
-    elif choice == 5: # Standard Audio
-        format_selection = 'bestaudio[abr<=128]'
-        output_folder = audio_folder
-        postprocessors.append({'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3', 'preferredquality': '128'})
-    elif choice == 6: # Low Audio
-        format_selection = 'worstaudio/bestaudio[abr<=64]'
-        output_folder = audio_folder
-        postprocessors.append({'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3', 'preferredquality': '96'})
-
-    output_path_template = os.path.join(output_folder, '%(playlist)s/%(playlist_index)s - %(clean_title)s - [%(id)s].%(ext)s')
-    ydl_opts = {'format': format_selection, 'outtmpl': output_path_template, 'postprocessors': postprocessors, 'ignoreerrors': True}
+    preset = list(QUALITY_PRESETS)[choice - 1]
+    _, format_selection, output_type, postprocessor = QUALITY_PRESETS[preset]
+    postprocessors = [mp3_postprocessor(postprocessor)]
+    output_folder = audio_folder if output_type == 'audio' else video_folder
+
+    # --- Download the entries in parallel ---
+    # The flat playlist already lists every entry's URL, so several entries can run at once.
+    # The playlist folder and index are filled in here, as the entries are downloaded on their own.
+    try:
+        info = get_shared_ydl(url, PLAYLIST_LIST_OPTS).extract_info(url, download=False)
+        entry_urls = [e.get('url') or e.get('webpage_url') for e in info.get('entries') or [] if e]
+    except Exception:
+        entry_urls = []
+    if entry_urls and all(entry_urls):
+        playlist_dir = sanitize_filename(str(info.get('title') or info.get('id'))).replace('%', '%%')
+        width = len(str(len(entry_urls)))
+        workers = min(BATCH_WORKERS, len(entry_urls))
+        print(f"\nStarting playlist download of {len(entry_urls)} videos, {workers} at a time... this may take a while.")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for index, entry_url in enumerate(entry_urls, 1):
+                filename = os.path.join(playlist_dir, f"{index:0{width}d} - {VIDEO_FILENAME}")
+                executor.submit(download_with_preset, entry_url, preset, audio_folder, video_folder, filename)
+        print("\nPlaylist download finished!")
+        return
+
+    output_path_template = os.path.join(output_folder, PLAYLIST_FILENAME)
+    ydl_opts = {'format': format_selection, 'outtmpl': output_path_template, 'postprocessors': postprocessors, 'ignoreerrors': True, **_transfer_opts, **extractor_opts(url)}
 
     try:
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
@@ -240,22 +588,112 @@ def handle_playlist_download(url, audio_folder, video_folder):
     except Exception as e:
         print(f"\nAn unexpected error occurred during playlist download: {e}")
 
-def process_url(url, audio_folder, video_folder):
+def make_batch_progress_hook(url):
+    """
+    Returns a yt-dlp progress hook that prints an occasional one-line status for a batch download.
+    """
+    last_report = [0.0]
+
+    def hook(d):
+        if d['status'] == 'finished':
+            console_print(f"Downloaded {format_size(d.get('total_bytes') or d.get('downloaded_bytes'))}: {url}")
+        elif d['status'] == 'downloading' and time.monotonic() - last_report[0] >= BATCH_PROGRESS_INTERVAL:
+            last_report[0] = time.monotonic()
+            total = d.get('total_bytes') or d.get('total_bytes_estimate')
+            eta = d.get('eta')
+            eta_str = f", ETA {eta:.0f}s" if eta is not None else ""
+            console_print(f"{format_size(d.get('downloaded_bytes'))} of {format_size(total)}{eta_str}: {url}")
+    return hook
+
+def download_with_preset(url, preset, audio_folder, video_folder, filename=VIDEO_FILENAME):
+    """
+    Downloads a single video with a fixed quality preset, without any prompts (used by batch mode
+    and for playlist entries). `filename` is the output template within the audio/video folder.
+    """
+    import yt_dlp
+    _, format_selection, output_type, postprocessor = QUALITY_PRESETS[preset]
+    output_folder = audio_folder if output_type == 'audio' else video_folder
+    ydl_opts = {
+        'format': format_selection,
+        'outtmpl': os.path.join(output_folder, filename),
+        'postprocessors': [mp3_postprocessor(postprocessor)],
+        'noplaylist': True,
+        # Several downloads share the console, so keep yt-dlp's own output quiet
+        'quiet': True,
+        'noprogress': True,
+        'progress_hooks': [make_batch_progress_hook(url)],
+        **_transfer_opts,
+        **extractor_opts(url),
+    }
+    try:
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            console_print(f"Starting: {url}")
+            ydl.download([url])
+            console_print(f"Finished: {url}")
+    except Exception as e:
+        console_print(f"Failed: {url} ({e})")
+
+async def run_batch(urls, preset, workers, audio_folder, video_folder):
+    """
+    Downloads many URLs concurrently, at most `workers` at a time.
+    """
+    slots = asyncio.Semaphore(workers)
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=workers)
+    async def run_one(url):
+        async with slots:
+            await loop.run_in_executor(executor, download_with_preset, sanitize_youtube_url(url), preset, audio_folder, video_folder)
+    try:
+        await asyncio.gather(*(run_one(url) for url in urls))
+    except asyncio.CancelledError:
+        # Ctrl+C: drop the queued URLs instead of waiting for them; running downloads can't be interrupted
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+
+def process_url(url, audio_folder, video_folder, quick=False):
     """
     Checks if a URL is a playlist and dispatches to the correct handler.
     """
     sanitized_url = sanitize_youtube_url(url)
+    # A plain video link needs no probe, and neither does a video seen recently (unless the
+    # link names a playlist too); the format menu fetches (or reuses) what it needs
+    probable_playlist = is_probable_playlist(sanitized_url)
+    if probable_playlist is False or (probable_playlist is None and recall_info(sanitized_url) is not None):
+        handle_single_download(sanitized_url, audio_folder, video_folder, quick)
+        return
     
-    ydl_opts = {'quiet': True, 'extract_flat': True}
+    # A watch link inside a playlist also names a single video; fetch its formats already,
+    # in case the user picks that video once the playlist has been confirmed.
+    # The --quick menu never looks at the formats, so there is nothing to prefetch for it.
+    single_future = None
+    if not quick and 'v' in parse_qs(urlparse(sanitized_url).query):
+        single_future = _fetch_executor.submit(prefetch_single_info, sanitized_url)
+
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(sanitized_url, download=False)
-            
-        if 'entries' in info and info.get('playlist_count'):
-            print(f"\nThis URL contains a playlist with {info['playlist_count']} videos.")
-            print("1: Download the entire playlist")
-            print("2: Download only the single video from the URL")
-            print("3: Go back")
+        ydl = get_shared_ydl(sanitized_url, PLAYLIST_PROBE_OPTS)
+        # The unprocessed result is enough to recognise a playlist, without resolving any entry
+        probe = _fetch_executor.submit(ydl.extract_info, sanitized_url, download=False, process=False)
+        print("Checking the URL, please wait...")
+        info = probe.result()
+        is_playlist = info.get('_type') == 'playlist'
+        if not is_playlist:
+            # A video (or a link to one): resolve it as usual. For a plain video URL this is the
+            # full format list, so cache it and the format menu won't extract the URL again.
+            info = ydl.process_ie_result(info, download=False)
+            is_playlist = info.get('_type') == 'playlist'
+            if not is_playlist and info.get('formats'):
+                remember_info(sanitized_url, info)
+                store_cached_info(sanitized_url, info, ydl)
+
+        if is_playlist:
+            count = info.get('playlist_count')
+            header = f"This URL contains a playlist with {count} videos." if count else "This URL contains a playlist."
+            with _console_lock:
+                sys.stdout.write(f"\n{header}\n"
+                                 "1: Download the entire playlist\n"
+                                 "2: Download only the single video from the URL\n"
+                                 "3: Go back\n")
             
             while True:
                 choice = input("Enter your choice (1-3): ")
@@ -263,25 +701,54 @@ def process_url(url, audio_folder, video_folder):
                     handle_playlist_download(sanitized_url, audio_folder, video_folder)
                     break
                 elif choice == '2':
-                    handle_single_download(sanitized_url, audio_folder, video_folder)
+                    single_url = sanitized_url
+                    if single_future is not None:
+                        try:
+                            single_info = single_future.result()
+                            # Keyed by the video's own URL: under the playlist URL, entering that
+                            # URL again would skip the playlist question
+                            single_url = single_info.get('webpage_url') or sanitized_url
+                            remember_info(single_url, single_info)
+                        except Exception:
+                            pass  # get_smart_choices fetches it again and reports the error
+                        single_future = None
+                    handle_single_download(single_url, audio_folder, video_folder, quick)
                     break
                 elif choice == '3':
                     break
                 else:
                     print("Invalid choice.")
         else:
-            handle_single_download(sanitized_url, audio_folder, video_folder)
+            handle_single_download(sanitized_url, audio_folder, video_folder, quick)
 
     except Exception as e:
         if 'DRM' in str(e):
             print("\nError: This content is protected by DRM.")
         else:
             print(f"\nAn error occurred while checking the URL: {e}")
+    finally:
+        # Not needed (anymore); drop it if it hasn't started yet
+        if single_future is not None:
+            single_future.cancel()
 
 def main():
     """
-    Main function to run the downloader script in a loop.
+    Main function to run the downloader script in a loop, or over a batch file of URLs.
     """
+    parser = argparse.ArgumentParser(description="Universal Audio/Video Downloader")
+    parser.add_argument('--batch', metavar='FILE', help="download every URL listed in FILE (one per line) without prompting")
+    parser.add_argument('--format', choices=list(QUALITY_PRESETS), default='best', help="quality preset used in batch mode (default: best)")
+    parser.add_argument('--workers', type=int, default=BATCH_WORKERS, help=f"number of simultaneous downloads in batch mode (default: {BATCH_WORKERS}, max: {MAX_BATCH_WORKERS})")
+    parser.add_argument('--quick', action='store_true', help="show a fixed quality menu without fetching the available formats and their sizes first")
+    parser.add_argument('--vbr', action='store_true', help="encode MP3s with LAME VBR (-q:a) instead of a constant bitrate, which is faster")
+    parser.add_argument('--background', action='store_true', help="download single videos in the background and return to the URL prompt right away")
+    parser.add_argument('--frag-workers', type=int, default=FRAGMENT_WORKERS, help=f"number of fragments of a DASH/HLS stream fetched at once (default: {FRAGMENT_WORKERS})")
+    args = parser.parse_args()
+
+    global _use_vbr, _background_downloads
+    _use_vbr = args.vbr
+    _transfer_opts['concurrent_fragment_downloads'] = max(1, args.frag_workers)
+
     try:
         desktop_path = os.path.join(os.path.expanduser('~'), 'Desktop')
         main_download_folder = os.path.join(desktop_path, 'Universal Audio Video Downloader')
@@ -295,22 +762,37 @@ def main():
         audio_folder, video_folder = 'Audio', 'Video'
         os.makedirs(audio_folder, exist_ok=True)
         os.makedirs(video_folder, exist_ok=True)
-        
-    # --- Main Loop ---
+
     try:
+        # --- Batch Mode ---
+        if args.batch:
+            with open(args.batch, encoding='utf-8') as batch_file:
+                urls = [line.strip() for line in batch_file if line.strip() and not line.lstrip().startswith('#')]
+            workers = max(1, min(args.workers, MAX_BATCH_WORKERS))
+            print(f"Downloading {len(urls)} URLs with {workers} workers...")
+            asyncio.run(run_batch(urls, args.format, workers, audio_folder, video_folder))
+            print("\nBatch download finished!")
+            return
+
+        # --- Main Loop ---
+        if args.background:
+            _background_downloads = ThreadPoolExecutor(max_workers=BATCH_WORKERS)
         while True:
             print("\n--- Universal Audio/Video Downloader ---")
             print("Supports YouTube, Vimeo, SoundCloud, etc. Does NOT support DRM sites like Spotify.")
             url = input("Please enter the URL (or type 'exit' to quit): ")
 
             if url.lower() in ['exit', 'quit']:
+                if _background_downloads is not None:
+                    print("Waiting for background downloads to finish...")
+                    _background_downloads.shutdown(wait=True)
                 print("Exiting. Goodbye!")
                 break
             if not url:
                 print("No URL provided.")
                 continue
             
-            process_url(url, audio_folder, video_folder)
+            process_url(url, audio_folder, video_folder, args.quick)
             print("\n" + "="*50 + "\n")
     except KeyboardInterrupt:
         print("\n\nExiting downloader. Goodbye!")
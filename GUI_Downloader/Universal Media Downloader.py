@@ -6,46 +6,82 @@
 
 import customtkinter as ctk
 import yt_dlp
+import asyncio
+import atexit
+import heapq
+import multiprocessing
+import queue
 import threading
 import os
 import sys
+import time
 import webbrowser
-from urllib.parse import urlparse, urlunparse, parse_qs, urlencode
+from functools import lru_cache
+from operator import itemgetter
+from urllib.parse import urlparse, urlunparse, parse_qs
+
+# Minimum time (in seconds) between two progress redraws
+PROGRESS_UPDATE_INTERVAL = 0.2
+# Status line shown while downloading; every field may be an empty string
+PROGRESS_STATUS_TEMPLATE = "Status: Downloading{playlist} | {percent} of {total}{speed}{eta}"
+# How often (in milliseconds) queued log messages are applied to the status label
+LOG_DRAIN_INTERVAL_MS = 100
+
+# Options for the quick probe that tells playlists apart from single videos.
+# Playlist entries are left unresolved so large playlists don't cost one request per item.
+PLAYLIST_PROBE_OPTS = {'quiet': True, 'extract_flat': 'in_playlist', 'lazy_playlist': True, 'skip_download': True}
+# Options for fetching the full format list of a single video
+SINGLE_VIDEO_OPTS = {'quiet': True, 'noplaylist': True}
+
+# Hostnames whose URLs sanitize_youtube_url cleans up
+_YT_HOSTS = frozenset({'www.youtube.com', 'youtube.com', 'm.youtube.com', 'music.youtube.com', 'youtu.be'})
+
+# YoutubeDL instances reused across fetches, keyed by their options.
+# An instance is not reentrant, so extractions are serialized by the lock.
+_shared_ydls = {}
+_shared_ydls_lock = threading.Lock()
+
+# Units used by format_size, and the divisor for each
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+_SIZE_DIVS = tuple(1 << (10 * n) for n in range(len(_SIZE_UNITS)))
 
 # --- Helper Functions ---
 
+@lru_cache(maxsize=1024)
 def format_size(size_in_bytes):
     """Converts bytes to a human-readable format (KB, MB, GB)."""
-    if size_in_bytes is None or size_in_bytes == 0:
+    if not size_in_bytes:
         return "N/A"
-    power = 1024
-    n = 0
-    power_labels = {0: '', 1: 'K', 2: 'M', 3: 'G', 4: 'T'}
-    while size_in_bytes >= power and n < len(power_labels):
-        size_in_bytes /= power
-        n += 1
-    return f"{size_in_bytes:.2f} {power_labels[n]}B"
+    # Every 10 bits is one more factor of 1024, so bit_length picks the unit without a loop
+    n = max(0, min((int(size_in_bytes).bit_length() - 1) // 10, 4))
+    return f"{size_in_bytes / _SIZE_DIVS[n]:.2f} {_SIZE_UNITS[n]}"
 
+@lru_cache(maxsize=256)
 def sanitize_youtube_url(url):
     """Sanitizes YouTube URLs to remove tracking parameters."""
     parsed_url = urlparse(url)
     hostname = parsed_url.hostname
-    if not (hostname and ('youtube.com' in hostname or 'youtu.be' in hostname)):
+    if hostname not in _YT_HOSTS:
         return url
     
     clean_url = ""
-    if 'youtube.com' in hostname and parsed_url.path == '/watch':
-        query_params = parse_qs(parsed_url.query)
+    if hostname != 'youtu.be' and parsed_url.path == '/watch':
+        # Single pass over the query keeping only the first non-empty 'v' and 'list'.
+        # The values stay in their original (already URL-encoded) form.
         sanitized_params = {}
-        if 'v' in query_params: sanitized_params['v'] = query_params['v'][0]
-        if 'list' in query_params: sanitized_params['list'] = query_params['list'][0]
+        for pair in parsed_url.query.split('&'):
+            key, _, value = pair.partition('=')
+            if key in ('v', 'list') and value and key not in sanitized_params:
+                sanitized_params[key] = value
         if sanitized_params:
-            clean_url = urlunparse((parsed_url.scheme, parsed_url.netloc, parsed_url.path, '', urlencode(sanitized_params), ''))
-    elif 'youtu.be' in hostname:
+            sanitized_query = '&'.join(f"{key}={sanitized_params[key]}" for key in ('v', 'list') if key in sanitized_params)
+            clean_url = urlunparse((parsed_url.scheme, parsed_url.netloc, parsed_url.path, '', sanitized_query, ''))
+    elif hostname == 'youtu.be':
         clean_url = urlunparse((parsed_url.scheme, parsed_url.netloc, parsed_url.path, '', '', ''))
     
     return clean_url if clean_url and url != clean_url else url
 
+@lru_cache(maxsize=None)
 def get_ffmpeg_path():
     """Determines the path to FFmpeg, whether running as a script or a frozen .exe."""
     if getattr(sys, 'frozen', False):
@@ -62,26 +98,126 @@ def get_ffmpeg_path():
             # Fallback to assuming ffmpeg is in the system's PATH
             return 'ffmpeg'
 
+@lru_cache(maxsize=None)
+def get_aria2c_path():
+    """Finds the aria2c binary bundled next to FFmpeg; returns None if there is none."""
+    base_dir = sys._MEIPASS if getattr(sys, 'frozen', False) else os.path.dirname(os.path.abspath(__file__))
+    for name in ('aria2c.exe', 'aria2c'):
+        aria2c_path = os.path.join(base_dir, name)
+        if os.path.exists(aria2c_path):
+            return aria2c_path
+    return None
+
+def extract_url_info(url, ydl_opts):
+    """Runs a blocking yt-dlp metadata extraction for the given URL on a shared instance."""
+    key = tuple(sorted(ydl_opts.items()))
+    with _shared_ydls_lock:
+        ydl = _shared_ydls.get(key)
+        if ydl is None:
+            ydl = _shared_ydls[key] = yt_dlp.YoutubeDL(ydl_opts)
+        return ydl.extract_info(url, download=False)
+
+@atexit.register
+def close_shared_ydls():
+    """Releases the shared YoutubeDL instances when the app exits."""
+    with _shared_ydls_lock:
+        for ydl in _shared_ydls.values():
+            ydl.close()
+        _shared_ydls.clear()
+
+def error_summary(e):
+    """Returns the last line of an exception's message, which is the part worth showing."""
+    # yt-dlp errors carry their message in .msg; avoid formatting the whole exception
+    msg = e.msg if isinstance(e, yt_dlp.utils.DownloadError) and e.msg else str(e)
+    return msg.rsplit('\n', 1)[-1]
+
+def is_playlist_info(info):
+    """Checks whether an extract_info result describes a playlist with entries."""
+    # With lazy_playlist the total count may be unknown, so fall back to the entries themselves
+    return 'entries' in info and bool(info.get('playlist_count') or info.get('entries'))
+
+# --- Download Worker Process ---
+# Log lines relayed from the worker; everything else from yt-dlp's debug stream is ignored by the GUI
+RELAYED_DEBUG_PREFIXES = ('[Merger]', '[ExtractAudio]', '[VideoRemuxer]')
+# Progress fields the GUI displays; the rest of yt-dlp's dict (e.g. info_dict) is too large to send
+PROGRESS_FIELDS = ('status', 'downloaded_bytes', 'total_bytes', 'total_bytes_estimate', '_percent_str', '_total_bytes_str', '_speed_str', '_eta_str')
+
+class QueueLogger:
+    """yt-dlp logger for the worker process that forwards messages to the GUI process."""
+    def __init__(self, events):
+        self.events = events
+    def debug(self, msg):
+        if msg.startswith(RELAYED_DEBUG_PREFIXES):
+            self.events.put(('log', ('debug', msg)))
+    def info(self, msg):
+        pass
+    def warning(self, msg):
+        self.events.put(('log', ('warning', msg)))
+    def error(self, msg):
+        self.events.put(('log', ('error', msg)))
+
+def progress_snapshot(d):
+    """Reduces a yt-dlp progress dict to the small, picklable part the GUI needs."""
+    snapshot = {key: d[key] for key in PROGRESS_FIELDS if key in d}
+    info_dict = d.get('info_dict') or {}
+    snapshot['info_dict'] = {'playlist_index': info_dict.get('playlist_index'), 'n_entries': info_dict.get('n_entries')}
+    return snapshot
+
+async def run_download(url, ydl_opts):
+    """Runs one blocking yt-dlp download in a worker thread so several can overlap."""
+    def download():
+        # yt-dlp instances are not thread-safe, so every download gets a fresh one
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            ydl.download([url])
+    await asyncio.to_thread(download)
+
+async def download_playlist_entries(playlist_job, ydl_opts, workers, events):
+    """Downloads playlist entries concurrently, at most `workers` at a time."""
+    entry_urls = playlist_job['entry_urls']
+    index_width = len(str(len(entry_urls)))
+    slots = asyncio.Semaphore(workers)
+
+    async def download_entry(index, entry_url):
+        entry_opts = dict(ydl_opts, outtmpl=os.path.join(playlist_job['folder'], f'{index:0{index_width}d} - %(clean_title)s [%(id)s].%(ext)s'))
+        async with slots:
+            await run_download(entry_url, entry_opts)
+        events.put(('entry_done', None))
+
+    await asyncio.gather(*(download_entry(index, entry_url) for index, entry_url in enumerate(entry_urls, 1)))
+
+def download_worker(url, ydl_opts, playlist_job, workers, events):
+    """Entry point of the download process; reports progress, logs and the outcome through a queue."""
+    ydl_opts = dict(ydl_opts, progress_hooks=[lambda d: events.put(('progress', progress_snapshot(d)))], logger=QueueLogger(events))
+    try:
+        if playlist_job:
+            asyncio.run(download_playlist_entries(playlist_job, ydl_opts, workers, events))
+        else:
+            asyncio.run(run_download(url, ydl_opts))
+        events.put(('done', None))
+    except Exception as e:
+        events.put(('done', error_summary(e)))
+
 # --- Custom Logger for GUI ---
 class MyLogger:
+    """Queues status messages for the app, which applies them in batches on the main thread."""
     def __init__(self, app):
         self.app = app
     def debug(self, msg):
         # This is for messages that are not about the download progress itself,
         # such as post-processing steps.
         if msg.startswith('[Merger]'):
-            self.app.after(0, self.app.update_status, f"Status: Merging video and audio...")
+            self.app._log_q.put("Status: Merging video and audio...")
         elif msg.startswith('[ExtractAudio]'):
-             self.app.after(0, self.app.update_status, f"Status: Converting to MP3...")
+             self.app._log_q.put("Status: Converting to MP3...")
         elif msg.startswith('[VideoRemuxer]'):
-             self.app.after(0, self.app.update_status, f"Status: Finalizing video file...")
+             self.app._log_q.put("Status: Finalizing video file...")
 
     def info(self, msg):
         pass # Usually redundant with debug messages
     def warning(self, msg):
-        self.app.after(0, self.app.update_status, f"Status: Warning - {msg}")
+        self.app._log_q.put(f"Status: Warning - {msg}")
     def error(self, msg):
-        self.app.after(0, self.app.update_status, f"Status: Error - {msg}")
+        self.app._log_q.put(f"Status: Error - {msg}")
 
 class App(ctk.CTk):
     def __init__(self):
@@ -107,6 +243,8 @@ class App(ctk.CTk):
         self.url_entry.grid(row=0, column=0, padx=10, pady=10, sticky="ew")
         # Bind the Enter key to the fetch button's command
         self.url_entry.bind("<Return>", lambda event: self.start_fetch_thread())
+        # Forget the cached fetch result as soon as the URL is edited
+        self.url_entry.bind("<KeyRelease>", self.invalidate_info_cache)
 
         self.fetch_button = ctk.CTkButton(self.url_frame, text="Fetch Info", command=self.start_fetch_thread)
         self.fetch_button.grid(row=0, column=1, padx=10, pady=10)
@@ -117,6 +255,13 @@ class App(ctk.CTk):
         self.options_frame.grid_columnconfigure(0, weight=1)
         self.options_label = ctk.CTkLabel(self.options_frame, text="Download Options", font=ctk.CTkFont(weight="bold"))
         self.options_label.grid(row=0, column=0, padx=10, pady=10, sticky="w")
+
+        # Opt-in: aria2c is faster, but yt-dlp gets no live progress from it (only "finished")
+        self.use_aria2c = ctk.BooleanVar(value=False)
+        self.aria2c_checkbox = ctk.CTkCheckBox(self.options_frame, text="Faster downloads with aria2c (no live progress)", variable=self.use_aria2c)
+        self.aria2c_checkbox.grid(row=0, column=1, padx=10, pady=10, sticky="e")
+        if get_aria2c_path() is None:
+            self.aria2c_checkbox.configure(state="disabled")
         
         # Scrollable Frame for download choices
         self.scrollable_frame = ctk.CTkScrollableFrame(self, label_text="Choices")
@@ -131,6 +276,13 @@ class App(ctk.CTk):
         self.download_frame.grid_columnconfigure(0, weight=1)
         self.download_frame.grid_columnconfigure(1, weight=1) # Allow attribution to be centered
 
+        # Number of playlist entries downloaded in parallel
+        self.playlist_workers = ctk.StringVar(value="4")
+        self.workers_menu = ctk.CTkOptionMenu(self.download_frame, values=["1", "2", "4", "8"], variable=self.playlist_workers, width=70)
+        self.workers_menu.grid(row=0, column=1, padx=10, pady=10, sticky="e")
+        self.workers_label = ctk.CTkLabel(self.download_frame, text="Parallel playlist downloads:")
+        self.workers_label.grid(row=0, column=0, padx=10, pady=10, sticky="e")
+
         self.download_button = ctk.CTkButton(self.download_frame, text="Download", command=self.start_download_thread, state="disabled")
         self.download_button.grid(row=0, column=2, padx=10, pady=10)
 
@@ -150,6 +302,26 @@ class App(ctk.CTk):
         self.attribution_label.grid(row=4, column=0, columnspan=3, padx=10, pady=(0, 5), sticky="s")
         self.attribution_label.bind("<Button-1>", lambda e: self.open_link("https://github.com/Askari64"))
         
+        # --- Parallel Playlist Progress ---
+        self._progress_lock = threading.Lock()
+        self._playlist_done = 0
+        self._playlist_total = 0
+        self._pending_progress = None
+        self._last_ui_update = 0.0
+
+        # --- Log Messages, applied in batches by _drain_log_q ---
+        self._log_q = queue.SimpleQueue()
+        self.after(LOG_DRAIN_INTERVAL_MS, self._drain_log_q)
+
+        # --- Result of the last Fetch Info, reused by the download step ---
+        self._last_url = None
+        self._last_info = None
+        self._last_is_playlist = None
+
+        # --- Background Event Loop for Metadata Fetches ---
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+
         # --- Setup Download Folders ---
         self.setup_folders()
 
@@ -158,14 +330,23 @@ class App(ctk.CTk):
         webbrowser.open_new(url)
 
     def setup_folders(self):
-        """Creates the necessary download folders on the user's desktop."""
+        """Works out the download folders on the user's desktop; they are created on first download."""
+        desktop_path = os.path.join(os.path.expanduser('~'), 'Desktop')
+        self.main_download_folder = os.path.join(desktop_path, 'Universal Audio Video Downloader')
+        self.audio_folder = os.path.join(self.main_download_folder, 'Audio')
+        self.video_folder = os.path.join(self.main_download_folder, 'Video')
+        self._folders_ready = False
+        
+        self.path_label.configure(text=f"Downloads will be saved to: {self.main_download_folder}")
+
+    def ensure_download_folders(self):
+        """Creates the download folders the first time they are needed."""
+        if self._folders_ready:
+            return
         try:
-            desktop_path = os.path.join(os.path.expanduser('~'), 'Desktop')
-            self.main_download_folder = os.path.join(desktop_path, 'Universal Audio Video Downloader')
-            self.audio_folder = os.path.join(self.main_download_folder, 'Audio')
-            self.video_folder = os.path.join(self.main_download_folder, 'Video')
-            os.makedirs(self.audio_folder, exist_ok=True)
-            os.makedirs(self.video_folder, exist_ok=True)
+            for folder in (self.audio_folder, self.video_folder):
+                if not os.path.isdir(folder):
+                    os.makedirs(folder)
         except Exception:
             # Fallback to current directory if desktop is not writable
             self.main_download_folder = os.path.abspath(os.getcwd())
@@ -173,70 +354,95 @@ class App(ctk.CTk):
             self.video_folder = 'Video'
             os.makedirs(self.audio_folder, exist_ok=True)
             os.makedirs(self.video_folder, exist_ok=True)
-        
-        self.path_label.configure(text=f"Downloads will be saved to: {self.main_download_folder}")
+            self.after(0, lambda: self.path_label.configure(text=f"Downloads will be saved to: {self.main_download_folder}"))
+        self._folders_ready = True
 
     def start_fetch_thread(self):
-        """Starts a new thread to fetch video/playlist info without freezing the GUI."""
+        """Starts fetching video/playlist info in the background without freezing the GUI."""
         self.fetch_button.configure(state="disabled", text="Fetching...")
         self.download_button.configure(state="disabled")
         self.clear_options()
         self.status_label.configure(text="Status: Fetching URL info...")
         url = self.url_entry.get()
         if url:
-            thread = threading.Thread(target=self.fetch_info, args=(url,), daemon=True)
-            thread.start()
+            self.fetch_info(url)
+
+    def fetch_info(self, url, single=False):
+        """Schedules a metadata fetch on the background event loop."""
+        entry_url = self._last_url = self.url_entry.get()
+        asyncio.run_coroutine_threadsafe(self._async_fetch(url, entry_url, single), self._loop)
 
-    def fetch_info(self, url):
-        """The actual fetching logic that runs in a separate thread."""
+    async def _async_fetch(self, url, entry_url, single=False):
+        """The actual fetching logic; blocking yt-dlp calls are pushed to worker threads."""
         sanitized_url = sanitize_youtube_url(url)
-        # Check for playlist first
         try:
-            with yt_dlp.YoutubeDL({'quiet': True, 'extract_flat': True}) as ydl:
-                info = ydl.extract_info(sanitized_url, download=False)
-                if 'entries' in info and info.get('playlist_count'):
-                    self.after(0, self.display_playlist_options, info, sanitized_url)
-                else:
-                    # If not a playlist, get detailed info for size calculation
-                    with yt_dlp.YoutubeDL({'quiet': True, 'noplaylist': True}) as ydl_single:
-                        single_info = ydl_single.extract_info(sanitized_url, download=False)
-                    self.after(0, self.display_quality_options, False, single_info)
+            info = None
+            # Check for playlist first, unless the user already asked for a single video
+            if not single:
+                info = await asyncio.to_thread(extract_url_info, sanitized_url, PLAYLIST_PROBE_OPTS)
+                if is_playlist_info(info):
+                    self.after(0, self.apply_fetch_result, entry_url, info, True, sanitized_url)
+                    return
+            # Flat extraction already resolves a plain video URL fully, so reuse it when it has formats
+            if not (info and info.get('formats')):
+                info = await asyncio.to_thread(extract_url_info, sanitized_url, SINGLE_VIDEO_OPTS)
+            self.after(0, self.apply_fetch_result, entry_url, info, False, sanitized_url)
+        except yt_dlp.utils.DownloadError as e:
+            if 'DRM' in (getattr(e, 'msg', '') or ''):
+                self.after(0, self.update_status, "Error: This content is DRM protected.")
+            else:
+                self.after(0, self.update_status, f"Error: {error_summary(e)}")
+            self.after(0, self.enable_fetch_button)
         except Exception as e:
-            error_message = f"Error: {str(e).splitlines()[-1]}"
-            if 'DRM' in str(e):
-                error_message = "Error: This content is DRM protected."
-            self.after(0, self.update_status, error_message)
+            self.after(0, self.update_status, f"Error: {error_summary(e)}")
             self.after(0, self.enable_fetch_button)
 
+    def apply_fetch_result(self, entry_url, info, is_playlist, url):
+        """Caches and shows a fetch result, unless the URL was edited while it was being fetched."""
+        if self.url_entry.get() != entry_url:
+            self.enable_fetch_button()
+            return
+        self._last_info, self._last_is_playlist = info, is_playlist
+        if is_playlist:
+            self.display_playlist_options(info, url)
+        else:
+            self.display_quality_options(False, info)
+
+    def invalidate_info_cache(self, event=None):
+        """Drops the cached fetch result if the URL no longer matches it."""
+        if self.url_entry.get() != self._last_url:
+            self._last_url = self._last_info = self._last_is_playlist = None
+
     def display_playlist_options(self, info, url):
         """Displays options for a playlist."""
-        self.status_label.configure(text=f"Status: Playlist found with {info['playlist_count']} items.")
+        entries = info.get('entries') or []
+        self.status_label.configure(text=f"Status: Playlist found with {info.get('playlist_count') or len(entries)} items.")
+
+        # A watch URL already names its video; a bare playlist URL falls back to its first entry
+        first_entry = (entries or [None])[0] or {}
+        single_url = url if parse_qs(urlparse(url).query).get('v') else first_entry.get('url') or url
         
         options = [
             ("Download Entire Playlist", "playlist"),
             ("Download Single Video Only", "single")
         ]
         
-        for text, value in options:
-            radio_button = ctk.CTkRadioButton(self.scrollable_frame, text=text, variable=self.download_choice, value=value)
-            radio_button.grid(sticky="w", padx=20, pady=5)
-            self.radio_buttons.append(radio_button)
+        self.add_radio_buttons(options)
 
         self.download_choice.set("playlist") # Default selection
-        self.download_button.configure(state="normal", text="Next", command=lambda: self.handle_playlist_or_single(url))
+        self.download_button.configure(state="normal", text="Next", command=lambda: self.handle_playlist_or_single(single_url))
         self.enable_fetch_button()
 
-    def handle_playlist_or_single(self, url):
+    def handle_playlist_or_single(self, single_url):
         """Decides whether to show playlist quality options or single video options."""
         choice = self.download_choice.get()
         self.clear_options()
         if choice == "playlist":
             self.display_quality_options(True, None) # No info needed for playlist quality
         else:
-            # Re-fetch detailed info for the single video to show sizes
+            # Fetch detailed info for the single video only to show sizes
             self.fetch_button.configure(state="disabled", text="Fetching...")
-            thread = threading.Thread(target=self.fetch_info, args=(url,), daemon=True)
-            thread.start()
+            self.fetch_info(single_url, single=True)
 
     def display_quality_options(self, is_playlist, info):
         """Displays a standardized list of quality options."""
@@ -263,42 +469,43 @@ class App(ctk.CTk):
             formats = info.get('formats', [])
             
             # --- Robust Size Calculation Logic (aligned with CLI) ---
-            best_audio_for_merge = max(
-                (f for f in formats if f.get('vcodec') == 'none' and f.get('acodec') != 'none' and f.get('abr') is not None),
-                key=lambda f: f.get('abr', 0),
-                default=None
-            )
-            best_audio_size = best_audio_for_merge.get('filesize') or best_audio_for_merge.get('filesize_approx') or 0 if best_audio_for_merge else 0
-
-            # Filter video streams with ext=='mp4' (fix to match CLI)
-            video_streams = [f for f in formats if f.get('vcodec') != 'none' and f.get('acodec') == 'none' and f.get('ext') == 'mp4' and f.get('tbr') is not None]
-            
-            def find_best_video(streams, height):
-                target_streams = [s for s in streams if s.get('height') == height]
-                if not target_streams: return None
-                sized_streams = [s for s in target_streams if s.get('filesize') or s.get('filesize_approx')]
-                return max(sized_streams or target_streams, key=lambda f: f.get('tbr', 0), default=None)
-
-            best_1080p = find_best_video(video_streams, 1080)
-            best_720p = find_best_video(video_streams, 720)
-            best_480p = find_best_video(video_streams, 480)
-
-            size_1080 = (best_1080p.get('filesize') or best_1080p.get('filesize_approx') or 0) + best_audio_size if best_1080p else 0
-            size_720 = (best_720p.get('filesize') or best_720p.get('filesize_approx') or 0) + best_audio_size if best_720p else 0
-            size_480 = (best_480p.get('filesize') or best_480p.get('filesize_approx') or 0) + best_audio_size if best_480p else 0
-
-            # Audio streams (fix to include filesize_approx for all)
-            audio_streams = sorted([f for f in formats if f.get('vcodec') == 'none' and f.get('acodec') != 'none' and f.get('abr') is not None], key=lambda x: x['abr'], reverse=True)
-            std_audio_size = (audio_streams[len(audio_streams)//2].get('filesize') or audio_streams[len(audio_streams)//2].get('filesize_approx') or 0) if len(audio_streams) > 2 else best_audio_size
-            low_audio_size = (audio_streams[-1].get('filesize') or audio_streams[-1].get('filesize_approx') or 0) if len(audio_streams) > 1 else best_audio_size
+            # Stage every relevant format once as a small tuple, so each dict field is read
+            # a single time; size already falls back from 'filesize' to 'filesize_approx'.
+            audio_rows = []  # (abr, size)
+            video_rows = {1080: [], 720: [], 480: []}  # (has_size, tbr, size)
+            for f in formats:
+                vcodec = f.get('vcodec')
+                acodec = f.get('acodec')
+                size = f.get('filesize') or f.get('filesize_approx') or 0
+                if vcodec == 'none' and acodec != 'none':
+                    abr = f.get('abr')
+                    if abr is not None:
+                        audio_rows.append((abr, size))
+                # Video-only mp4 streams (matches the CLI filter)
+                elif vcodec != 'none' and acodec == 'none' and f.get('ext') == 'mp4':
+                    rows = video_rows.get(f.get('height'))
+                    tbr = f.get('tbr')
+                    if rows is not None and tbr is not None:
+                        rows.append((size > 0, tbr, size))
+
+            best_audio = max(audio_rows, key=itemgetter(0), default=None)
+            best_audio_size = best_audio[1] if best_audio else 0
+            # Streams with a known size win over unsized ones, then the highest bitrate
+            best_video = {height: max(rows, key=itemgetter(0, 1), default=None) for height, rows in video_rows.items()}
+            size_1080, size_720, size_480 = (best_video[h][2] + best_audio_size if best_video[h] else 0 for h in (1080, 720, 480))
+
+            # Audio tiers: the median and lowest bitrate streams, picked without a full sort.
+            # Ties resolve to the same stream as the old stable descending sort did.
+            if len(audio_rows) > 2:
+                std_audio_size = heapq.nlargest(len(audio_rows) // 2 + 1, audio_rows, key=itemgetter(0))[-1][1]
+            else:
+                std_audio_size = best_audio_size
+            low_audio_size = min(reversed(audio_rows), key=itemgetter(0))[1] if len(audio_rows) > 1 else best_audio_size
 
             sizes = [size_1080, size_720, size_480, best_audio_size, std_audio_size, low_audio_size]
 
-        for i, ((text, value), size) in enumerate(zip(options_map.items(), sizes)):
-            label = f"{text} (~{format_size(size)})" if not is_playlist and size > 0 else text
-            radio_button = ctk.CTkRadioButton(self.scrollable_frame, text=label, variable=self.download_choice, value=value)
-            radio_button.grid(row=i, column=0, sticky="w", padx=20, pady=5)
-            self.radio_buttons.append(radio_button)
+        self.add_radio_buttons([(f"{text} (~{format_size(size)})" if not is_playlist and size > 0 else text, value)
+                                for (text, value), size in zip(options_map.items(), sizes)])
         
         self.download_choice.set(list(options_map.values())[0]) # Default to best video
         self.download_button.configure(state="normal")
@@ -312,24 +519,33 @@ class App(ctk.CTk):
         
         url = self.url_entry.get()
         format_selection = self.download_choice.get()
+        workers = int(self.playlist_workers.get())
+        use_aria2c = self.use_aria2c.get()
         
-        thread = threading.Thread(target=self.download_media, args=(url, format_selection), daemon=True)
+        thread = threading.Thread(target=self.download_media, args=(url, format_selection, workers, use_aria2c), daemon=True)
         thread.start()
 
-    def download_media(self, url, format_selection):
-        """The actual download logic that runs in a thread."""
+    def download_media(self, url, format_selection, workers=1, use_aria2c=False):
+        """Prepares the download and relays events from the yt-dlp worker process; runs in a thread."""
         is_audio_only = ('bestaudio' in format_selection or 'worstaudio' in format_selection) and '+' not in format_selection
         
-        # Re-check if it's a playlist for correct output path
-        is_playlist = False
-        try:
-            with yt_dlp.YoutubeDL({'quiet': True, 'extract_flat': True}) as ydl:
-                info = ydl.extract_info(url, download=False)
-                if 'entries' in info and info.get('playlist_count'):
-                    is_playlist = True
-        except Exception:
-            pass # Ignore errors here, main error handling is elsewhere
+        # Reuse the playlist check from Fetch Info if it was made for this URL; otherwise re-check
+        is_playlist, info = None, None
+        if url == self._last_url:
+            is_playlist, info = self._last_is_playlist, self._last_info
+        if is_playlist is None:
+            is_playlist = False
+            try:
+                info = extract_url_info(url, PLAYLIST_PROBE_OPTS)
+                is_playlist = is_playlist_info(info)
+            except Exception:
+                pass # Ignore errors here, main error handling is elsewhere
+
+        # A single video picked from a playlist URL is downloaded from its own page
+        if not is_playlist and info:
+            url = info.get('webpage_url') or url
 
+        self.ensure_download_folders()
         output_folder = self.audio_folder if is_audio_only else self.video_folder
         
         if is_playlist:
@@ -348,69 +564,174 @@ class App(ctk.CTk):
             'outtmpl': output_template,
             'postprocessors': postprocessors,
             'ffmpeg_location': get_ffmpeg_path(),
-            'progress_hooks': [self.update_progress],
-            'logger': MyLogger(self),
             'ignoreerrors': True,
+            'noplaylist': not is_playlist,
+            # Fetch DASH/HLS fragments over several connections at once
+            'concurrent_fragment_downloads': min(8, os.cpu_count() or 4),
+            'http_chunk_size': 10 * 1024 * 1024,
+            # Larger write buffer means fewer syscalls on slow or network-backed disks
+            'buffersize': 64 * 1024,
+            'retries': 10,
+            'fragment_retries': 10,
         }
+
+        # aria2c splits each file over several keep-alive connections. It is only used when the user
+        # asked for it: yt-dlp sends no progress updates for external downloaders, so the progress
+        # bar, speed and ETA would stand still until the file is done.
+        aria2c_path = get_aria2c_path() if use_aria2c else None
+        if aria2c_path:
+            ydl_opts['external_downloader'] = {'default': aria2c_path}
+            ydl_opts['external_downloader_args'] = {'aria2c': ['-x', '8', '-s', '8', '-k', '1M', '--file-allocation=none']}
         
+        # Parallel playlist mode only needs the entry URLs and the target folder
+        playlist_job = None
+        if is_playlist and workers > 1:
+            entry_urls = [e.get('url') or e.get('webpage_url') for e in info.get('entries') or [] if e]
+            # An entry without a URL can't be downloaded on its own; let yt-dlp walk the playlist instead
+            if entry_urls and all(entry_urls):
+                playlist_folder = yt_dlp.utils.sanitize_filename(info.get('title') or 'Playlist').replace('%', '%%')
+                playlist_job = {'folder': os.path.join(output_folder, playlist_folder), 'entry_urls': entry_urls}
+                with self._progress_lock:
+                    self._playlist_done = 0
+                    self._playlist_total = len(entry_urls)
+
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([url])
-            
-            final_message = "Status: Playlist download complete!" if is_playlist else "Status: Download complete!"
-            self.after(0, self.update_status, final_message)
+            # yt-dlp runs in its own interpreter so it never competes with Tk for the GIL.
+            # 'spawn' is the only start method that works for the frozen Windows/macOS builds.
+            ctx = multiprocessing.get_context('spawn')
+            events = ctx.Queue()
+            process = ctx.Process(target=download_worker, args=(url, ydl_opts, playlist_job, workers, events), daemon=True)
+            process.start()
+            error = self.relay_download_events(process, events)
+            process.join()
+
+            if error:
+                self.after(0, self.update_status, f"Error: {error}")
+            else:
+                final_message = "Status: Playlist download complete!" if is_playlist else "Status: Download complete!"
+                self.after(0, self.update_status, final_message)
 
         except Exception as e:
-            self.after(0, self.update_status, f"Error: {str(e).splitlines()[-1]}")
+            self.after(0, self.update_status, f"Error: {error_summary(e)}")
         finally:
+            with self._progress_lock:
+                self._playlist_done = self._playlist_total = 0
             self.after(0, self.enable_fetch_button)
             self.after(0, self.clear_options)
             self.after(0, lambda: self.status_label.configure(text="Status: Ready"))
 
+    def relay_download_events(self, process, events):
+        """Forwards worker events to the GUI until the download finishes; returns its error, if any."""
+        logger = MyLogger(self)
+        while True:
+            try:
+                kind, payload = events.get(timeout=0.5)
+            except queue.Empty:
+                if not process.is_alive():
+                    return "The download process exited unexpectedly."
+                continue
+            if kind == 'progress':
+                self.update_progress(payload)
+            elif kind == 'log':
+                level, msg = payload
+                getattr(logger, level)(msg)
+            elif kind == 'entry_done':
+                with self._progress_lock:
+                    self._playlist_done += 1
+            elif kind == 'done':
+                return payload
 
     def update_progress(self, d):
-        """Hook for yt-dlp to update the GUI's progress bar and status."""
+        """Hook for yt-dlp; coalesces per-chunk updates into at most one redraw per interval."""
+        self._pending_progress = d
+        if d['status'] == 'downloading':
+            now = time.monotonic()
+            if now - self._last_ui_update < PROGRESS_UPDATE_INTERVAL:
+                return
+            self._last_ui_update = now
+        self.after(0, self._flush_progress)
+
+    def _flush_progress(self):
+        """Applies the latest progress update to the progress bar and status label."""
+        d = self._pending_progress
+        if d is None:
+            return
         if d['status'] == 'downloading':
             total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate')
             if total_bytes:
                 percentage = d['downloaded_bytes'] / total_bytes
-                self.progress_bar.set(percentage)
+                with self._progress_lock:
+                    playlist_done, playlist_total = self._playlist_done, self._playlist_total
+
+                # Parallel playlist downloads report overall progress instead of per-file
+                if playlist_total:
+                    self.progress_bar.set(min(1, (playlist_done + percentage) / playlist_total))
+                else:
+                    self.progress_bar.set(percentage)
 
-                # Build a more user-friendly status string
-                status_str = f"Status: Downloading"
-                
+                # Build a more user-friendly status string from a single template
                 info_dict = d.get('info_dict', {})
                 playlist_index = info_dict.get('playlist_index')
                 playlist_count = info_dict.get('n_entries')
-
-                if playlist_index and playlist_count:
-                    status_str += f" (File {playlist_index}/{playlist_count})"
-                
-                percent_str = d.get('_percent_str', '').strip()
-                total_bytes_str = d.get('_total_bytes_str', '').strip()
                 speed_str = d.get('_speed_str', '').strip()
                 eta_str = d.get('_eta_str', '').strip()
 
-                status_str += f" | {percent_str} of {total_bytes_str}"
-                
-                if speed_str:
-                    status_str += f" at {speed_str}"
-                if eta_str:
-                    status_str += f" (ETA: {eta_str})"
-
+                if playlist_total:
+                    playlist_str = f" ({playlist_done}/{playlist_total} files done)"
+                elif playlist_index and playlist_count:
+                    playlist_str = f" (File {playlist_index}/{playlist_count})"
+                else:
+                    playlist_str = ""
+
+                status_str = PROGRESS_STATUS_TEMPLATE.format_map({
+                    'playlist': playlist_str,
+                    'percent': d.get('_percent_str', '').strip(),
+                    'total': d.get('_total_bytes_str', '').strip(),
+                    'speed': f" at {speed_str}" if speed_str else "",
+                    'eta': f" (ETA: {eta_str})" if eta_str else "",
+                })
                 self.status_label.configure(text=status_str)
 
         elif d['status'] == 'finished':
-            self.progress_bar.set(1)
+            with self._progress_lock:
+                playlist_total = self._playlist_total
+            if not playlist_total:
+                self.progress_bar.set(1)
             self.status_label.configure(text="Status: Download complete. Processing...")
         elif d['status'] == 'error':
              self.status_label.configure(text="Status: Error during download.")
 
+    def add_radio_buttons(self, options):
+        """Creates a radio button per (label, value) pair with a single layout pass at the end."""
+        # Pause geometry propagation so the frame isn't re-laid out after every .grid() call
+        self.scrollable_frame.grid_propagate(False)
+        radio_buttons = [ctk.CTkRadioButton(self.scrollable_frame, text=label, variable=self.download_choice, value=value)
+                         for label, value in options]
+        for i, radio_button in enumerate(radio_buttons):
+            radio_button.grid(row=i, column=0, sticky="w", padx=20, pady=5)
+        self.radio_buttons.extend(radio_buttons)
+        self.scrollable_frame.grid_propagate(True)
+        self.scrollable_frame.update_idletasks()
+
     def clear_options(self):
         """Removes all radio buttons from the options frame."""
+        self.scrollable_frame.grid_propagate(False)
         for widget in self.scrollable_frame.winfo_children():
             widget.destroy()
         self.radio_buttons = []
+        self.scrollable_frame.grid_propagate(True)
+
+    def _drain_log_q(self):
+        """Shows only the newest queued log message, then re-arms itself."""
+        text = None
+        try:
+            while True:
+                text = self._log_q.get_nowait()
+        except queue.Empty:
+            pass
+        if text is not None:
+            self.status_label.configure(text=text)
+        self.after(LOG_DRAIN_INTERVAL_MS, self._drain_log_q)
 
     def update_status(self, text):
         """Schedules a status label update on the main thread."""
@@ -421,5 +742,7 @@ class App(ctk.CTk):
         self.fetch_button.configure(state="normal", text="Fetch Info")
 
 if __name__ == "__main__":
+    # Required for the download worker process in PyInstaller builds
+    multiprocessing.freeze_support()
     app = App()
     app.mainloop()